@@ -8,8 +8,10 @@ from the gamefunctions module.
 """
 
 import gamefunctions
+import os
 import random
 import save_load
+import telemetry
 
 def start_game(name):
     """Prompt player to start a new game or load a previous one"""
@@ -28,8 +30,19 @@ def start_game(name):
             }
         
     elif choice == "2":
-        filename = input("Enter filename to load (default: savegame.json): ").strip() or "savegame.json"
-        player = save_load.load_game(filename)
+        slots = save_load.list_slots()
+        if slots:
+            print("Saved games:")
+            for slot, slot_name, saved_at in slots:
+                print(f"  {slot} ({slot_name})")
+        slot = input("Enter save slot to load (default: savegame): ").strip() or "savegame"
+        # Older saves are single JSON files, e.g. savegame.json from before slots
+        if slot.endswith(".json"):
+            player = save_load.load_game(slot)
+        elif not save_load.slot_exists(slot) and os.path.exists(slot + ".json"):
+            player = save_load.load_game(slot + ".json")
+        else:
+            player = save_load.load_slot(slot)
         if player is None:
             print("Starting a new game instead")
             player = {
@@ -43,6 +56,9 @@ def start_game(name):
             
         if "map_state" not in player:
             player["map_state"] = {}
+
+        # Older saves keep one inventory entry per item
+        gamefunctions.stack_inventory(player)
             
     else:
         print("Invalid choice, starting new game instead")
@@ -61,15 +77,28 @@ def game_menu(player):
     while True:
         print("1) Continue adventure")
         print("2) Save and Quit")
+        print("3) Delete a saved game")
         choice = input("Choose an option: ").strip()
 
         if choice == "1":
             return
         elif choice == "2":
-            filename = input("Enter filename to save (default: savegame.json): ").strip() or "savegame.json"
-            save_load.save_game(player, filename)
+            slot = input("Enter save slot name (default: savegame): ").strip() or "savegame"
+            if not save_load.save_slot(player, slot):
+                print("Try a different slot name (letters and numbers work best).")
+                continue
+            # drop chunks that only the overwritten save was using
+            save_load.prune_chunks()
             print("Bye-bye!")
             return "quit"
+        elif choice == "3":
+            for slot, slot_name, saved_at in save_load.list_slots():
+                print(f"  {slot} ({slot_name})")
+            slot = input("Enter save slot to delete: ").strip()
+            if save_load.delete_slot(slot):
+                print(f"Deleted {slot}.")
+            else:
+                print("No saved game by that name.")
         else:
             print("Invalid option.")
 
@@ -85,6 +114,9 @@ def main():
 
     player = start_game(name)
 
+    # Record fights, purchases and HP/gold for this session
+    telemetry.start()
+
     
 
 #Main game loop
@@ -92,6 +124,7 @@ def main():
     while True:
         print("\nYou are in town.")
         print(f"Current HP: {player['hp']}, Gold: {player['gold']}")
+        telemetry.record_status(player.get("name", ""), player["hp"], player["gold"])
         print("What would you like to do?")
         print("1) Leave town (Fight Monster / Explore Map)")
         print("2) Sleep (Restore HP for 5 Gold)")
@@ -107,19 +140,18 @@ def main():
             action, player["map_state"] = gamefunctions.open_map(player, player["map_state"])
 
             if action == "monster":
-                idx = player["map_state"].get("encounter_idx")
-                if idx is not None:
-                    m = player["map_state"]["monsters"][idx]  # dict version
-                    monster = m  # fight_monster expects a dict
+                m = gamefunctions.find_monster(player["map_state"], player["map_state"].get("encounter_id"))
+                if m is not None:
+                    monster = m.as_encounter_dict()  # fight_monster expects a dict
 
                     # fight
                     player["hp"], player["gold"] = gamefunctions.fight_monster(
                         player, player["hp"], player["gold"], monster
                     )
 
-                    # If monster died, mark it dead in map_state
-                    if monster["health"] <= 0:
-                        player["map_state"]["monsters"][idx]["alive"] = False
+                    # If monster died, take it off the map
+                    if not monster.get("alive", True):
+                        gamefunctions.remove_monster(player["map_state"], m)
 
                 continue
             
@@ -142,7 +174,7 @@ def main():
             if not player["inventory"]:
                 print("  (empty)")
             for item in player["inventory"]:
-                item_info = f"{item['name']} (Type: {item['type']})"
+                item_info = f"{item['name']} x{item.get('quantity', 1)} (Type: {item['type']})"
                 if item["type"] == "weapon":
                     item_info += f", Durability: {item['currentDurability']}/{item['maxDurability']}"
                 if item["type"] == "special":
@@ -165,6 +197,8 @@ def main():
 
         else:
             print("You have to enter from 1-7, man.")
+
+    telemetry.stop()
             
 
 
@@ -7,7 +7,10 @@ This module has  several functions used in an adventure game.
 import random
 import pygame
 import sys
-from wanderingMonster import WanderingMonster
+from wanderingMonster import WanderingMonster, MonsterPool
+from mapworld import MapWorld, SimulationThread
+from visibility import Visibility
+import telemetry
 TILE_SIZE = 32
 
 def load_image(path, fallback_color, size=(32, 32)):
@@ -34,7 +37,21 @@ PLAYER_COLOR = (0, 120, 200)  # Blue player square
 TOWN_COLOR = (0, 200, 0)      # Green circle for town
 MONSTER_COLOR = (200, 0, 0)   # Red circle for monster
 GRID_LINE_COLOR = (50, 50, 50)
+FOG_COLOR = (25, 25, 25)      # Explored tiles that are out of sight
 BG_COLOR = (0, 0, 0)
+VIEW_RADIUS = 3               # How many tiles the player can see
+MONSTER_COUNT = 2             # Living monsters the map is topped back up to
+
+# Dead monsters wait here to be reused by the next respawn
+_monster_pool = MonsterPool()
+
+# Arrow keys -> (dx, dy)
+KEY_DIRECTIONS = {
+    pygame.K_UP: (0, -1),
+    pygame.K_DOWN: (0, 1),
+    pygame.K_LEFT: (-1, 0),
+    pygame.K_RIGHT: (1, 0),
+}
 
 def open_map(player, map_state):
     """
@@ -43,9 +60,12 @@ def open_map(player, map_state):
     map_state: persistent map dictionary, contains:
         - player_pos: [x,y]
         - town_pos: [x,y]
-        - monsters: [ {serializable monster dict}, ... ]
+        - monsters: [ WanderingMonster, ... ]  (living monsters only; save_load converts them to dicts)
         - player_move_count: int  (to track every-other-move)
-        - encounter_idx: index of monster to encounter (set when returning "monster")
+        - next_monster_id: int  (next stable monster id to hand out)
+        - encounter_id: id of monster to encounter (only present when returning "monster")
+        - monster_index: {monster id: position in monsters} (session only, never saved)
+        - explored: hex bitset of tiles the player has seen
     """
 
     # Helper to ensure stored values are lists
@@ -55,7 +75,7 @@ def open_map(player, map_state):
     # Load map state (or defaults)
     player_pos = _as_list(map_state.get("player_pos", [0, 0]))
     town_pos = _as_list(map_state.get("town_pos", [0, 0]))
-    monsters_data = map_state.get("monsters", None)
+    monsters = map_state.get("monsters", None)
     player_move_count = int(map_state.get("player_move_count", 0))
 
     pygame.init()
@@ -68,142 +88,185 @@ def open_map(player, map_state):
     clock = pygame.time.Clock()
     font = pygame.font.SysFont(None, 18)
 
-    # If no monsters present or list empty, create two monsters
-    monsters = []
-    if monsters_data:
-        # restore objects (but keep them serializable via dicts)
-        for md in monsters_data:
-            monsters.append(WanderingMonster.from_dict(md, tile_size=TILE_SIZE))
-
-    else:
-        # create two monsters not on player or town
-        avoid = [tuple(player_pos), tuple(town_pos)]
-        m1 = WanderingMonster.random_at(GRID_SIZE, town_pos, avoid_positions=avoid, tile_size=TILE_SIZE)
-
-        monsters.append(m1)
-        # Add second monster; ensure not same location
-        avoid.append((m1.x, m1.y))
-        m2 = WanderingMonster.random_at(GRID_SIZE, town_pos, avoid_positions=avoid, tile_size=TILE_SIZE)
-        monsters.append(m2)
-    left_town = False
-    running = True
-
-    # Helper to serialize monsters into map_state for persistence
-    def serialize_monsters(lst):
-        return [m.to_dict() for m in lst]
-
-    while running:
+    if monsters is None:
+        monsters = []
+        map_state["monsters"] = monsters
+        _rebuild_monster_index(map_state)
+    elif monsters and isinstance(monsters[0], dict):
+        # a freshly loaded save holds dicts; turn the living ones into live monsters once
+        monsters = [WanderingMonster.from_dict(md, tile_size=TILE_SIZE) for md in monsters if md.get("alive", True)]
+        for m in monsters:
+            if m.id is None:
+                m.id = _next_monster_id(map_state)
+        # the list was replaced, so any index into the old one is wrong now
+        map_state["monsters"] = monsters
+        _rebuild_monster_index(map_state)
+
+    # Respawn up to MONSTER_COUNT, reusing dead monsters from the pool
+    if len(monsters) < MONSTER_COUNT:
+        index = _monster_index(map_state)
+        avoid = [player_pos] + [(m.x, m.y) for m in monsters]
+        for m in WanderingMonster.spawn_many(MONSTER_COUNT - len(monsters), GRID_SIZE, town_pos,
+                                             avoid_positions=avoid, tile_size=TILE_SIZE, pool=_monster_pool):
+            m.id = _next_monster_id(map_state)
+            index[m.id] = len(monsters)
+            monsters.append(m)
+
+    visibility = Visibility(GRID_SIZE, VIEW_RADIUS, explored=map_state.get("explored"))
+    world = MapWorld(GRID_SIZE, player_pos, town_pos, monsters, player_move_count, visibility)
+
+    # Helper to hand the live world back to map_state (no copying)
+    def store_world():
+        map_state["player_pos"] = world.player_pos
+        map_state["town_pos"] = world.town_pos
+        map_state["monsters"] = world.monsters
+        map_state["player_move_count"] = world.player_move_count
+        map_state["explored"] = visibility.explored_to_str()
+
+    # Helper to blend a tile position between the last two snapshots
+    def lerp(old, new, alpha):
+        return (
+            (old[0] + (new[0] - old[0]) * alpha) * TILE,
+            (old[1] + (new[1] - old[1]) * alpha) * TILE,
+        )
+
+    # Explored tiles are painted onto their own layer as they come into view,
+    # so a frame only has to touch the tiles that are visible right now
+    fog_layer = pygame.Surface((SCREEN_SIZE, SCREEN_SIZE))
+    fog_layer.fill(BG_COLOR)
+
+    def paint_explored(gx, gy):
+        rect = pygame.Rect(gx * TILE, gy * TILE, TILE, TILE)
+        fog_layer.fill(FOG_COLOR, rect)
+        pygame.draw.rect(fog_layer, GRID_LINE_COLOR, rect, 1)
+
+    for gx in range(GRID_SIZE):
+        for gy in range(GRID_SIZE):
+            if visibility.is_explored(gx, gy):
+                paint_explored(gx, gy)
+    painted_visible = None
+
+    # Simulation runs on its own thread; this loop only handles input and drawing
+    sim = SimulationThread(world)
+    sim.start()
+
+    while sim.is_alive():
         for event in pygame.event.get():
 
             if event.type == pygame.QUIT:
                 # persist state before quitting program
-                map_state["player_pos"] = player_pos
-                map_state["town_pos"] = town_pos
-                map_state["monsters"] = serialize_monsters(monsters)
-                map_state["player_move_count"] = player_move_count
+                sim.stop()
+                store_world()
                 pygame.quit()
                 sys.exit(0)
 
             elif event.type == pygame.KEYDOWN:
-                new_x, new_y = player_pos[0], player_pos[1]
-
-                if event.key == pygame.K_UP:
-                    new_y = max(0, player_pos[1] - 1)
-                elif event.key == pygame.K_DOWN:
-                    new_y = min(GRID_SIZE - 1, player_pos[1] + 1)
-                elif event.key == pygame.K_LEFT:
-                    new_x = max(0, player_pos[0] - 1)
-                elif event.key == pygame.K_RIGHT:
-                    new_x = min(GRID_SIZE - 1, player_pos[0] + 1)
-                else:
-                    continue
-
-                # Apply movement
-                if (new_x, new_y) != (player_pos[0], player_pos[1]):
-                    player_pos[0], player_pos[1] = new_x, new_y
-                    player_move_count += 1
-
-                    # If player returned to town tile and has left previously, go back to town
-                    if [player_pos[0], player_pos[1]] == town_pos:
-                        if left_town:
-                            map_state["player_pos"] = player_pos
-                            map_state["town_pos"] = town_pos
-                            map_state["monsters"] = serialize_monsters(monsters)
-                            map_state["player_move_count"] = player_move_count
-                            pygame.quit()
-                            return ("town", map_state)
-                    else:
-                        left_town = True
-
-                    # After player moves, move monsters every other player move
-                    if player_move_count % 2 == 0:
-                        # build list of occupied positions to prevent monster stacking (except on player)
-                        occupied = [(m.x, m.y) for m in monsters if m.alive]
-                        for m in monsters:
-                            # pass current occupied positions excluding this monster's own pos
-                            others = [p for p in occupied if p != (m.x, m.y)]
-                            m.move(GRID_SIZE, town_pos, player_pos, occupied_positions=others)
-
-                        # after moving, see if any monster ended up on the player
-                        for idx, m in enumerate(monsters):
-                            if m.alive and (m.x, m.y) == tuple(player_pos):
-                                # store serialized monsters + encounter index for the caller
-                                map_state["player_pos"] = player_pos
-                                map_state["town_pos"] = town_pos
-                                map_state["monsters"] = serialize_monsters(monsters)
-                                map_state["player_move_count"] = player_move_count
-                                map_state["encounter_idx"] = idx
-                                pygame.quit()
-                                return ("monster", map_state)
-
-                    # If player stepped onto a monster tile, trigger encounter
-                    for idx, m in enumerate(monsters):
-                        if m.alive and (m.x, m.y) == tuple(player_pos):
-                            map_state["player_pos"] = player_pos
-                            map_state["town_pos"] = town_pos
-                            map_state["monsters"] = serialize_monsters(monsters)
-                            map_state["player_move_count"] = player_move_count
-                            map_state["encounter_idx"] = idx
-                            pygame.quit()
-                            return ("monster", map_state)
+                direction = KEY_DIRECTIONS.get(event.key)
+                if direction:
+                    sim.send(*direction)
 
-        # DRAWING
-        screen.fill(BG_COLOR)
+        previous, current, alpha = sim.latest()
+        visible = current.visible
 
-        # Grid
-        for gx in range(GRID_SIZE):
-            for gy in range(GRID_SIZE):
-                rect = pygame.Rect(gx * TILE, gy * TILE, TILE, TILE)
-                pygame.draw.rect(screen, GRID_LINE_COLOR, rect, 1)
+        # Tiles only need painting onto the fog layer when the view changes
+        if visible is not painted_visible:
+            for gx, gy in visible:
+                paint_explored(gx, gy)
+            painted_visible = visible
 
-        # Town
-        screen.blit(town_img, (town_pos[0] * TILE, town_pos[1] * TILE))
+        # DRAWING
+        screen.blit(fog_layer, (0, 0))
 
+        # Grid: tiles in sight are drawn clear on top of the fog
+        for gx, gy in visible:
+            rect = pygame.Rect(gx * TILE, gy * TILE, TILE, TILE)
+            screen.fill(BG_COLOR, rect)
+            pygame.draw.rect(screen, GRID_LINE_COLOR, rect, 1)
 
-        for m in monsters:
-            if m.alive:
-                screen.blit(m.image, (m.x * TILE, m.y * TILE))
+        # Town (remembered once explored)
+        if current.town_seen:
+            screen.blit(town_img, (town_pos[0] * TILE, town_pos[1] * TILE))
+
+        # Monsters are only drawn while in sight
+        for idx, (x, y, alive) in enumerate(current.monsters):
+            if alive and (x, y) in visible:
+                old = previous.monsters[idx] if idx < len(previous.monsters) else (x, y)
+                screen.blit(monsters[idx].image, lerp(old, (x, y), alpha))
 
 
         # Player
-        screen.blit(player_img, (player_pos[0] * TILE, player_pos[1] * TILE))
+        screen.blit(player_img, lerp(previous.player_pos, current.player_pos, alpha))
 
 
         # Debug overlay
-        info = f"Pos: {player_pos}  Town: {town_pos}  Monsters: {[ (m.x,m.y,m.name,m.alive) for m in monsters ]}"
+        info = f"Pos: {list(current.player_pos)}  Town: {town_pos}  Monsters: {[ (x, y, monsters[i].name, alive) for i, (x, y, alive) in enumerate(current.monsters) if (x, y) in visible ]}"
         text = font.render(info, True, (255, 255, 255))
         screen.blit(text, (4, SCREEN_SIZE - 18))
 
         pygame.display.flip()
         clock.tick(60)
 
-    # Fallback
-    map_state["player_pos"] = player_pos
-    map_state["town_pos"] = town_pos
-    map_state["monsters"] = serialize_monsters(monsters)
-    map_state["player_move_count"] = player_move_count
+    # The simulation thread has finished, so the world is ours again
+    store_world()
+    action, monster_id = world.outcome or ("town", None)
+    if action == "monster":
+        map_state["encounter_id"] = monster_id
+    else:
+        map_state.pop("encounter_id", None)
     pygame.quit()
-    return ("town", map_state)
+    return (action, map_state)
+
+
+def _next_monster_id(map_state):
+    """Hand out the next stable monster id for this map."""
+    monster_id = map_state.get("next_monster_id", 0)
+    map_state["next_monster_id"] = monster_id + 1
+    return monster_id
+
+
+def _rebuild_monster_index(map_state):
+    """Build map_state's monster_index from scratch. Call it whenever the monsters list is replaced."""
+    index = {m.id: idx for idx, m in enumerate(map_state.get("monsters") or [])}
+    map_state["monster_index"] = index
+    return index
+
+
+def _monster_index(map_state):
+    """
+    Return map_state's {monster id: position in monsters} map.
+    open_map and remove_monster keep it in step with the list; it is only
+    built here if it is missing (e.g. right after a load).
+    """
+    index = map_state.get("monster_index")
+    if index is None:
+        index = _rebuild_monster_index(map_state)
+    return index
+
+
+def find_monster(map_state, monster_id):
+    """Return the living monster with monster_id, or None if it is gone."""
+    idx = _monster_index(map_state).get(monster_id)
+    if idx is None:
+        return None
+    return map_state["monsters"][idx]
+
+
+def remove_monster(map_state, monster):
+    """
+    Take a dead monster off the map and put it in the pool for reuse.
+    The last monster is swapped into its place so nothing has to shift.
+    """
+    index = _monster_index(map_state)
+    idx = index.pop(monster.id, None)
+    if idx is None:
+        return
+
+    monsters = map_state["monsters"]
+    last = monsters.pop()
+    if last is not monster:
+        monsters[idx] = last
+        index[last.id] = idx
+    _monster_pool.release(monster)
 
 
 # Return a WanderingMonster instance (unplaced) for other uses
@@ -250,6 +313,8 @@ def fight_monster(player, player_hp, player_gold, monster):
         print("The monster is instantly defeated by your special item!")
         player_gold += monster["money"]
         print(f"You found {monster['money']} gold!")
+        telemetry.record_fight(player.get("name", ""), monster["name"], "special", monster["money"], character_health)
+        monster["alive"] = False
         return character_health, player_gold
 
     while character_health > 0 and monster_health > 0:
@@ -260,7 +325,9 @@ def fight_monster(player, player_hp, player_gold, monster):
             character_damage = random.randint(25, 75)
         
             if player.get("equippedWeapon"):
-                weapon = player["equippedWeapon"]
+                # Only the weapon in hand wears down, so take it off its stack
+                weapon = split_one(player, player["equippedWeapon"])
+                player["equippedWeapon"] = weapon
                 character_damage += weapon.get("damage_boost", 0)
                 weapon["currentDurability"] -= 1
                 print(f"You attack with {weapon['name']}! Durability left: {weapon['currentDurability']}")
@@ -268,7 +335,7 @@ def fight_monster(player, player_hp, player_gold, monster):
                 # Remove weapon if durability reaches 0
                 if weapon["currentDurability"] <= 0:
                         print(f"Your {weapon['name']} broke!")
-                        player["inventory"].remove(weapon)
+                        remove_from_inventory(player, weapon)
                         player["equippedWeapon"] = None
 
                 
@@ -287,6 +354,7 @@ def fight_monster(player, player_hp, player_gold, monster):
 
         elif action == "2":
             print("You get too scared. An onlooker to the battle, Sir Robin, joins you momentarily as you bravely run back to town.")
+            telemetry.record_fight(player.get("name", ""), monster["name"], "fled", 0, character_health)
             return character_health, player_gold
         else:
             print("That's not a command, silly.")
@@ -294,12 +362,16 @@ def fight_monster(player, player_hp, player_gold, monster):
     if character_health <= 0 and monster_health > 0:
             print('You lost. Never underestimate an opponent!')
             character_health = 1
+            telemetry.record_fight(player.get("name", ""), monster["name"], "lost", 0, character_health)
             
             
     if monster_health <= 0:
             print(f"You defeated the {monster['name']}!")
             player_gold += monster["money"]
             print(f"You found {monster['money']} gold!")
+            telemetry.record_fight(player.get("name", ""), monster["name"], "won", monster["money"], character_health)
+            # let the caller know to take the monster off the map
+            monster["alive"] = False
 
     return character_health, player_gold
 
@@ -348,6 +420,79 @@ def get_shop_items():
         ]
 
 
+def _stack_key(item):
+    """Everything about an item except how many of it there are."""
+    return tuple(sorted((k, v) for k, v in item.items() if k != "quantity"))
+
+
+def find_inventory_entry(player, item):
+    """Return the inventory stack holding item (or an identical item), or None."""
+    for entry in player["inventory"]:
+        if entry is item:
+            return entry
+    key = _stack_key(item)
+    for entry in player["inventory"]:
+        if _stack_key(entry) == key:
+            return entry
+    return None
+
+
+def add_to_inventory(player, item, quantity=1):
+    """
+    Adds quantity copies of item to the player's inventory.
+    Identical items share one entry with a "quantity" count.
+
+    Returns:
+        dict: The inventory entry the items ended up in.
+    """
+    entry = find_inventory_entry(player, item)
+    if entry is not None:
+        entry["quantity"] = entry.get("quantity", 1) + quantity
+        return entry
+
+    entry = dict(item)
+    entry["quantity"] = quantity
+    player["inventory"].append(entry)
+    return entry
+
+
+def remove_from_inventory(player, entry, quantity=1):
+    """Removes quantity items from an inventory entry, dropping it when empty."""
+    entry = find_inventory_entry(player, entry)
+    if entry is None:
+        return
+    entry["quantity"] = entry.get("quantity", 1) - quantity
+    if entry["quantity"] <= 0:
+        player["inventory"] = [e for e in player["inventory"] if e is not entry]
+
+
+def split_one(player, entry):
+    """
+    Separates a single item from its stack so it can change on its own
+    (for example a weapon losing durability). Returns the single item's entry.
+    """
+    stack = find_inventory_entry(player, entry)
+    if stack is None or stack.get("quantity", 1) <= 1:
+        return stack if stack is not None else entry
+
+    stack["quantity"] -= 1
+    single = dict(stack)
+    single["quantity"] = 1
+    player["inventory"].append(single)
+    return single
+
+
+def stack_inventory(player):
+    """Merges identical items in the inventory (used for saves made before stacking)."""
+    items = player["inventory"]
+    player["inventory"] = []
+    for item in items:
+        add_to_inventory(player, item, item.get("quantity", 1))
+
+    if player.get("equippedWeapon"):
+        player["equippedWeapon"] = find_inventory_entry(player, player["equippedWeapon"])
+
+
 def visit_shop(player):
     """Lets player buy items from the shop"""
     shop_items = get_shop_items()
@@ -365,10 +510,19 @@ def visit_shop(player):
     choice = int(choice)
     if 1 <= choice <= len(shop_items):
         item = shop_items[choice - 1]
-        if player["gold"] >= item["price"]:
-            player["gold"] -= item["price"]
-            player["inventory"].append(item)
-            print(f"You bought {item['name']}! Remaining gold: {player['gold']}")
+        quantity = input("How many would you like? (default: 1): ").strip() or "1"
+        if not quantity.isdigit() or int(quantity) < 1:
+            print("That's not a number I can sell you.")
+            return player
+
+        num_purchased, leftover_money = purchase_item(item["price"], player["gold"], int(quantity))
+        if num_purchased > 0:
+            player["gold"] = leftover_money
+            add_to_inventory(player, item, num_purchased)
+            telemetry.record_purchase(player.get("name", ""), item["name"], num_purchased, item["price"])
+            if num_purchased < int(quantity):
+                print(f"You could only afford {num_purchased}.")
+            print(f"You bought {num_purchased} x {item['name']}! Remaining gold: {player['gold']}")
 
         else:
             print("You don't have enough gold. Sorry!")
@@ -384,7 +538,7 @@ def equip_weapon(player):
 
     print("\nChoose a weapon to equip:")
     for i, weapon in enumerate(weapons, 1):
-        print(f"{i}) {weapon['name']} (Durability: {weapon['currentDurability']}/{weapon['maxDurability']})")
+        print(f"{i}) {weapon['name']} x{weapon.get('quantity', 1)} (Durability: {weapon['currentDurability']}/{weapon['maxDurability']})")
               
     choice = input("Enter number or press Enter to cancel: ")
     if not choice.isdigit():
@@ -400,9 +554,9 @@ def equip_weapon(player):
 def check_special_item(player):
     for item in player["inventory"]:
         if item["type"] == "special":
-            use = input(f"You have {item['name']} that can instantly defeat the monster. Use it? (y/n): ").lower()
+            use = input(f"You have {item['name']} x{item.get('quantity', 1)} that can instantly defeat the monster. Use it? (y/n): ").lower()
             if use == "y":
-                player["inventory"].remove(item)
+                remove_from_inventory(player, item)
                 print(f"You used {item['name']}! The monster is defeated instantly.")
                 return True
     return False
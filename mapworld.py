@@ -0,0 +1,188 @@
+# mapworld.py
+"""
+Map simulation that runs separately from drawing.
+
+MapWorld holds the rules for the map (player movement, monster movement,
+encounters). SimulationThread runs a MapWorld in its own thread and publishes
+immutable snapshots that the renderer can draw and interpolate between
+without touching the live world.
+"""
+
+import queue
+import threading
+import time
+from collections import namedtuple
+
+SIM_TICK_RATE = 20  # simulation steps per second
+
+# Immutable picture of the world at one tick.
+# monsters is a tuple of (x, y, alive), in the same order as MapWorld.monsters.
+# visible is a frozenset of visible tiles (None when the world has no fog of
+# war) and town_seen says whether the town tile has ever been in view.
+MapSnapshot = namedtuple("MapSnapshot", ["tick", "player_pos", "monsters", "visible", "town_seen"])
+
+
+class MapWorld:
+    """The live state of the map and the rules for changing it."""
+
+    def __init__(self, grid_size, player_pos, town_pos, monsters, player_move_count=0, visibility=None):
+        self.grid_size = grid_size
+        self.player_pos = player_pos
+        self.town_pos = town_pos
+        self.monsters = monsters
+        self.player_move_count = player_move_count
+        self.visibility = visibility
+        self.town_seen = visibility is None or visibility.is_explored(town_pos[0], town_pos[1])
+        self.tick = 0
+        self.left_town = False
+        # set to ("town", None) or ("monster", monster id) once the visit is over
+        self.outcome = None
+        self.update_visibility()
+
+    def move_player(self, dx, dy):
+        """Move the player one step, then run everything that follows from it."""
+        if self.outcome is not None:
+            return
+
+        new_x = min(self.grid_size - 1, max(0, self.player_pos[0] + dx))
+        new_y = min(self.grid_size - 1, max(0, self.player_pos[1] + dy))
+        if (new_x, new_y) == (self.player_pos[0], self.player_pos[1]):
+            return
+
+        self.player_pos[0], self.player_pos[1] = new_x, new_y
+        self.player_move_count += 1
+        self.update_visibility()
+
+        # If player returned to town tile and has left previously, go back to town
+        if [new_x, new_y] == list(self.town_pos):
+            if self.left_town:
+                self.outcome = ("town", None)
+                return
+        else:
+            self.left_town = True
+
+        # Monsters move every other player move
+        if self.player_move_count % 2 == 0:
+            self.move_monsters()
+
+        self.check_encounter()
+
+    def update_visibility(self):
+        """Recompute what the player can see after they move."""
+        if self.visibility is None:
+            return
+        visible = self.visibility.update(self.player_pos)
+        if not self.town_seen and tuple(self.town_pos) in visible:
+            self.town_seen = True
+
+    def move_monsters(self):
+        """Move every living monster one step without letting them stack."""
+        occupied = {(m.x, m.y) for m in self.monsters if m.alive}
+        for m in self.monsters:
+            if not m.alive:
+                continue
+            occupied.discard((m.x, m.y))
+            m.move(self.grid_size, self.town_pos, self.player_pos, occupied_positions=occupied)
+            occupied.add((m.x, m.y))
+
+    def check_encounter(self):
+        """End the visit with a fight if a living monster is on the player."""
+        for m in self.monsters:
+            if m.alive and (m.x, m.y) == tuple(self.player_pos):
+                self.outcome = ("monster", m.id)
+                return
+
+    def snapshot(self):
+        return MapSnapshot(
+            self.tick,
+            tuple(self.player_pos),
+            tuple((m.x, m.y, m.alive) for m in self.monsters),
+            self.visibility.visible if self.visibility else None,
+            self.town_seen,
+        )
+
+
+class SimulationThread(threading.Thread):
+    """
+    Runs a MapWorld and double-buffers its snapshots.
+
+    The world steps on a fixed timestep: once per tick every queued move is
+    applied and, if any of them changed the world, one new snapshot is
+    published. A move therefore waits at most one tick. On a tick with no
+    input nothing is rebuilt; once the renderer has finished interpolating
+    to the current snapshot the previous one is set equal to it.
+
+    The render thread only ever calls send() and latest(); the world itself is
+    only touched from this thread until it has finished.
+    """
+
+    def __init__(self, world, tick_rate=SIM_TICK_RATE):
+        super().__init__(daemon=True)
+        self.world = world
+        self.tick_rate = tick_rate
+        self.commands = queue.Queue()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+        snapshot = world.snapshot()
+        self._previous = snapshot
+        self._current = snapshot
+        self._published_at = time.perf_counter()
+
+    def send(self, dx, dy):
+        """Hand a player move to the simulation thread."""
+        self.commands.put((dx, dy))
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def latest(self):
+        """
+        Return (previous, current, alpha) where alpha (0..1) is how far the
+        renderer is between the two snapshots.
+        """
+        with self._lock:
+            previous, current, published_at = self._previous, self._current, self._published_at
+        alpha = min(1.0, (time.perf_counter() - published_at) * self.tick_rate)
+        return previous, current, alpha
+
+    def _publish(self, snapshot):
+        with self._lock:
+            self._previous = self._current
+            self._current = snapshot
+            self._published_at = time.perf_counter()
+
+    def _hold(self):
+        """Nothing changed this tick: reuse the current snapshot once its blend is done."""
+        with self._lock:
+            if time.perf_counter() - self._published_at >= 1.0 / self.tick_rate:
+                self._previous = self._current
+
+    def run(self):
+        step = 1.0 / self.tick_rate
+        next_tick = time.perf_counter() + step
+
+        while self.world.outcome is None:
+            # sleep until the next tick, waking early only to stop
+            if self._stop_event.wait(max(0.0, next_tick - time.perf_counter())):
+                break
+
+            moves_before = self.world.player_move_count
+            while self.world.outcome is None:
+                try:
+                    dx, dy = self.commands.get_nowait()
+                except queue.Empty:
+                    break
+                self.world.move_player(dx, dy)
+
+            self.world.tick += 1
+            if self.world.player_move_count != moves_before:
+                self._publish(self.world.snapshot())
+            else:
+                self._hold()
+
+            next_tick += step
+            if next_tick < time.perf_counter():
+                # fell behind; don't try to catch up with a burst of ticks
+                next_tick = time.perf_counter() + step
@@ -1,10 +1,34 @@
+import hashlib
 import json
+import os
+import time
+
+def to_serializable(player):
+    """
+    Return a copy of player that json can write.
+    map_state holds live WanderingMonster objects during play; they are only
+    turned into dicts here, when a save actually happens.
+    """
+    map_state = player.get("map_state")
+    if not map_state:
+        return player
+
+    data = dict(player)
+    data["map_state"] = dict(map_state)
+    # the id -> index lookup is rebuilt after loading, so it is never saved
+    data["map_state"].pop("monster_index", None)
+    if map_state.get("monsters"):
+        data["map_state"]["monsters"] = [
+            m.to_dict() if hasattr(m, "to_dict") else m for m in map_state["monsters"]
+        ]
+    return data
+
 
 def save_game(player, filename = "savegame.json"):
     """Saves the game to a JSON file"""
     try:
         with open(filename, "w") as f:
-            json.dump(player, f, indent = 4)
+            json.dump(to_serializable(player), f, indent = 4)
         print("Game successfully saved.")
     except Exception as e:
         print("Error saving game.")
@@ -22,5 +46,197 @@ def load_game(filename = "savegame.json"):
     except Exception as e:
         print("Error loading game.")
         return None
-    
 
+
+# Content-addressed save store
+#
+# Layout of a store directory:
+#   chunks/<sha256>.json  - immutable pieces of game state, named by their hash
+#   slots/<slot>.json     - small manifest listing the chunks for one save slot
+#
+# Identical chunks are only written once, so many slots (or backups) that share
+# the same inventory or monster table only cost one manifest each.
+
+MONSTER_SEGMENT_SIZE = 64
+
+
+def _encode_chunk(data):
+    """Return canonical JSON bytes for a chunk so equal data hashes equally."""
+    return json.dumps(data, sort_keys = True, separators = (",", ":")).encode("utf-8")
+
+
+def _write_atomic(path, data):
+    """Write bytes to path through a temp file so readers never see half a file."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _put_chunk(store_dir, data):
+    """Store one chunk (if it is new) and return its hash."""
+    raw = _encode_chunk(data)
+    digest = hashlib.sha256(raw).hexdigest()
+    path = os.path.join(store_dir, "chunks", digest + ".json")
+    if not os.path.exists(path):
+        _write_atomic(path, raw)
+    return digest
+
+
+def _get_chunk(store_dir, digest):
+    """Read a chunk back by its hash."""
+    with open(os.path.join(store_dir, "chunks", digest + ".json"), "r") as f:
+        return json.load(f)
+
+
+def _split_player(player):
+    """Split a player dict into (core, inventory, monster segments)."""
+    core = {k: v for k, v in player.items() if k not in ("inventory", "map_state")}
+    map_state = dict(player.get("map_state", {}))
+    monsters = map_state.pop("monsters", None)
+    core["map_state"] = map_state
+    core["has_monsters"] = monsters is not None
+
+    segments = []
+    for i in range(0, len(monsters or []), MONSTER_SEGMENT_SIZE):
+        segments.append(monsters[i:i + MONSTER_SEGMENT_SIZE])
+    return core, player.get("inventory", []), segments
+
+
+def _slot_path(store_dir, slot):
+    # a ".json" name would be stored as "<slot>.json.json" and could never be loaded again
+    if (not slot or os.sep in slot or (os.altsep and os.altsep in slot) or slot.startswith(".")
+            or slot.endswith(".json")):
+        raise ValueError(f"Invalid slot name: {slot!r}")
+    return os.path.join(store_dir, "slots", slot + ".json")
+
+
+def save_slot(player, slot = "savegame", store_dir = "saves"):
+    """Saves the game into a named slot of the chunk store.
+
+    Only chunks that are not already in the store get written. Chunks the
+    old manifest used are left in place; call prune_chunks() to clean up.
+
+    Returns:
+        bool: True if the slot was saved.
+    """
+    try:
+        # check the name before anything is written, so a bad name leaves no chunks behind
+        slot_path = _slot_path(store_dir, slot)
+        os.makedirs(os.path.join(store_dir, "chunks"), exist_ok = True)
+        os.makedirs(os.path.join(store_dir, "slots"), exist_ok = True)
+
+        core, inventory, segments = _split_player(to_serializable(player))
+        manifest = {
+            "name": player.get("name", ""),
+            "saved_at": time.time(),
+            "core": _put_chunk(store_dir, core),
+            "inventory": _put_chunk(store_dir, inventory),
+            "monsters": [_put_chunk(store_dir, seg) for seg in segments],
+        }
+        _write_atomic(slot_path, _encode_chunk(manifest))
+        print("Game successfully saved.")
+        return True
+    except Exception as e:
+        print("Error saving game.")
+        return False
+
+
+def load_slot(slot = "savegame", store_dir = "saves"):
+    """Load a player dict back out of a slot of the chunk store."""
+    try:
+        with open(_slot_path(store_dir, slot), "r") as f:
+            manifest = json.load(f)
+
+        player = _get_chunk(store_dir, manifest["core"])
+        player["inventory"] = _get_chunk(store_dir, manifest["inventory"])
+        if player.pop("has_monsters", False):
+            monsters = []
+            for digest in manifest["monsters"]:
+                monsters.extend(_get_chunk(store_dir, digest))
+            player["map_state"]["monsters"] = monsters
+        print("Game loaded successfully.")
+        return player
+    except FileNotFoundError:
+        print("No saved game found")
+        return None
+    except Exception as e:
+        print("Error loading game.")
+        return None
+
+
+def slot_exists(slot, store_dir = "saves"):
+    """Check whether a slot has a manifest in the store."""
+    try:
+        return os.path.exists(_slot_path(store_dir, slot))
+    except ValueError:
+        return False
+
+
+def list_slots(store_dir = "saves"):
+    """Return [(slot, player name, saved_at)] for every slot, newest first.
+
+    Only the small manifests are read, never the chunks.
+    """
+    slots_dir = os.path.join(store_dir, "slots")
+    if not os.path.isdir(slots_dir):
+        return []
+
+    slots = []
+    for entry in os.listdir(slots_dir):
+        if not entry.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(slots_dir, entry), "r") as f:
+                manifest = json.load(f)
+        except Exception:
+            continue
+        slots.append((entry[:-len(".json")], manifest.get("name", ""), manifest.get("saved_at", 0)))
+    slots.sort(key = lambda s: s[2], reverse = True)
+    return slots
+
+
+def delete_slot(slot, store_dir = "saves"):
+    """Remove a slot and any chunks only it was using."""
+    try:
+        os.remove(_slot_path(store_dir, slot))
+    except (FileNotFoundError, ValueError):
+        return False
+    prune_chunks(store_dir)
+    return True
+
+
+def prune_chunks(store_dir = "saves"):
+    """Delete chunks no slot refers to anymore. Returns how many were removed.
+
+    If any manifest can't be read, nothing is deleted, since its chunks
+    can't be told apart from unused ones.
+    """
+    slots_dir = os.path.join(store_dir, "slots")
+    chunks_dir = os.path.join(store_dir, "chunks")
+    if not os.path.isdir(chunks_dir):
+        return 0
+
+    live = set()
+    for entry in os.listdir(slots_dir) if os.path.isdir(slots_dir) else []:
+        if not entry.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(slots_dir, entry), "r") as f:
+                manifest = json.load(f)
+            live.add(manifest["core"])
+            live.add(manifest["inventory"])
+            live.update(manifest["monsters"])
+        except Exception:
+            print(f"WARNING: Skipping save cleanup, could not read {entry}.")
+            return 0
+
+    removed = 0
+    for entry in os.listdir(chunks_dir):
+        if entry.endswith(".json") and entry[:-len(".json")] not in live:
+            try:
+                os.remove(os.path.join(chunks_dir, entry))
+            except OSError:
+                continue
+            removed += 1
+    return removed
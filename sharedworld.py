@@ -0,0 +1,288 @@
+# sharedworld.py
+"""
+One map shared by many players.
+
+Monsters move once per world tick (with the same WanderingMonster rules as
+open_map). Monsters and players are each kept in a spatial hash, so working
+out what a player can see only looks at the few hash cells around them.
+Each player gets a WorldUpdate with just the changes inside their interest
+radius (monsters and other players), which makes a player's update cost
+depend on what is near them rather than on the size of the world.
+
+Run this file directly to load test it with simulated clients.
+"""
+
+import random
+import time
+from collections import namedtuple
+
+from wanderingMonster import WanderingMonster, MonsterPool, FreeCells
+
+INTEREST_RADIUS = 5  # tiles around a player they get updates for
+
+# What one player learns about after a tick.
+# entered and moved are tuples of (monster id, x, y); left is a tuple of ids;
+# encounters is a tuple of ids of monsters standing on the player.
+# players_entered and players_moved are tuples of (player name, x, y) for
+# other players nearby; players_left is a tuple of names.
+WorldUpdate = namedtuple("WorldUpdate", ["tick", "entered", "moved", "left", "encounters",
+                                         "players_entered", "players_moved", "players_left"])
+
+
+class SpatialHash:
+    """Buckets entity ids by which cell_size x cell_size square they are in."""
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def _cell(self, x, y):
+        return (x // self.cell_size, y // self.cell_size)
+
+    def insert(self, key, x, y):
+        self.cells.setdefault(self._cell(x, y), set()).add(key)
+
+    def remove(self, key, x, y):
+        cell = self._cell(x, y)
+        bucket = self.cells.get(cell)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self.cells[cell]
+
+    def move(self, key, old_x, old_y, new_x, new_y):
+        """Update an entity's position; only touches the buckets if it changed cell."""
+        if self._cell(old_x, old_y) != self._cell(new_x, new_y):
+            self.remove(key, old_x, old_y)
+            self.insert(key, new_x, new_y)
+
+    def query(self, x, y, radius):
+        """Yield every id in the cells that overlap the square around (x, y)."""
+        min_cx, min_cy = self._cell(x - radius, y - radius)
+        max_cx, max_cy = self._cell(x + radius, y + radius)
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                bucket = self.cells.get((cx, cy))
+                if bucket:
+                    yield from bucket
+
+
+class SharedWorld:
+    """The world state every connected player shares."""
+
+    def __init__(self, grid_size, town_pos, interest_radius=INTEREST_RADIUS, tile_size=32, rng=None):
+        self.grid_size = grid_size
+        self.town_pos = list(town_pos)
+        self.interest_radius = interest_radius
+        self.tile_size = tile_size
+        self.tick_count = 0
+        self.rng = rng or random.Random()  # all monster spawning and movement rolls use this
+
+        self.monsters = {}        # monster id -> WanderingMonster
+        self.occupied = set()     # tiles with a living monster on them
+        self.free = FreeCells(grid_size, [town_pos])  # tiles a monster could spawn on
+        self.monster_hash = SpatialHash(interest_radius)
+        self.next_monster_id = 0
+        self.pool = MonsterPool()  # killed monsters, reused by spawn_monsters
+
+        self.players = {}         # player name -> [x, y]
+        self.player_hash = SpatialHash(interest_radius)
+        self.known = {}           # player name -> {monster id: (x, y)} the player has been told about
+        self.known_players = {}   # player name -> {other player name: (x, y)} the player has been told about
+
+    def spawn_monsters(self, count):
+        """Place count new monsters on free tiles. Returns their ids."""
+        ids = []
+        # keep player tiles out of the draw for this spawn only
+        player_cells = [cell for cell in {tuple(p) for p in self.players.values()} if cell in self.free]
+        for x, y in player_cells:
+            self.free.remove(x, y)
+        spawned = WanderingMonster.spawn_many(count, self.grid_size, self.town_pos, tile_size=self.tile_size,
+                                              pool=self.pool, free=self.free, rng=self.rng)
+        for x, y in player_cells:
+            self.free.add(x, y)
+
+        for m in spawned:
+            monster_id = self.next_monster_id
+            self.next_monster_id += 1
+            self.monsters[monster_id] = m
+            self.occupied.add((m.x, m.y))
+            self.monster_hash.insert(monster_id, m.x, m.y)
+            ids.append(monster_id)
+        return ids
+
+    def add_player(self, name, pos=None):
+        self.players[name] = list(pos) if pos is not None else list(self.town_pos)
+        self.player_hash.insert(name, *self.players[name])
+        self.known[name] = {}
+        self.known_players[name] = {}
+
+    def remove_player(self, name):
+        pos = self.players.pop(name, None)
+        if pos is not None:
+            self.player_hash.remove(name, *pos)
+        self.known.pop(name, None)
+        self.known_players.pop(name, None)
+
+    def move_player(self, name, dx, dy):
+        """Move a player one step, clamped to the map like open_map does."""
+        pos = self.players[name]
+        old_x, old_y = pos
+        pos[0] = min(self.grid_size - 1, max(0, pos[0] + dx))
+        pos[1] = min(self.grid_size - 1, max(0, pos[1] + dy))
+        self.player_hash.move(name, old_x, old_y, pos[0], pos[1])
+
+    def kill_monster(self, monster_id):
+        """Take a monster out of the world (e.g. after a player beats it)."""
+        m = self.monsters.pop(monster_id, None)
+        if m is None:
+            return
+        self.occupied.discard((m.x, m.y))
+        self.free.add(m.x, m.y)
+        self.monster_hash.remove(monster_id, m.x, m.y)
+        self.pool.release(m)
+
+    def move_monsters(self):
+        """Move every monster one step, keeping occupied and the hash in sync."""
+        moved = set()
+        for monster_id, m in self.monsters.items():
+            old_x, old_y = m.x, m.y
+            self.occupied.discard((old_x, old_y))
+            m.move(self.grid_size, self.town_pos, None, occupied_positions=self.occupied, rng=self.rng)
+            self.occupied.add((m.x, m.y))
+            if (m.x, m.y) != (old_x, old_y):
+                self.free.add(old_x, old_y)
+                self.free.remove(m.x, m.y)
+                self.monster_hash.move(monster_id, old_x, old_y, m.x, m.y)
+                moved.add(monster_id)
+        return moved
+
+    def update_for(self, name, moved):
+        """Build one player's WorldUpdate by looking only at nearby hash cells."""
+        px, py = self.players[name]
+        radius = self.interest_radius
+        known = self.known[name]
+
+        in_range = {}
+        for monster_id in self.monster_hash.query(px, py, radius):
+            m = self.monsters[monster_id]
+            if abs(m.x - px) <= radius and abs(m.y - py) <= radius:
+                in_range[monster_id] = (m.x, m.y)
+
+        entered = []
+        moved_near = []
+        encounters = []
+        for monster_id, (x, y) in in_range.items():
+            if monster_id not in known:
+                entered.append((monster_id, x, y))
+            elif monster_id in moved or known[monster_id] != (x, y):
+                moved_near.append((monster_id, x, y))
+            if (x, y) == (px, py):
+                encounters.append(monster_id)
+        left = tuple(monster_id for monster_id in known if monster_id not in in_range)
+        self.known[name] = in_range
+
+        players_in_range = {}
+        for other in self.player_hash.query(px, py, radius):
+            x, y = self.players[other]
+            if other != name and abs(x - px) <= radius and abs(y - py) <= radius:
+                players_in_range[other] = (x, y)
+
+        known_players = self.known_players[name]
+        players_entered = []
+        players_moved = []
+        for other, (x, y) in players_in_range.items():
+            if other not in known_players:
+                players_entered.append((other, x, y))
+            elif known_players[other] != (x, y):
+                players_moved.append((other, x, y))
+        players_left = tuple(other for other in known_players if other not in players_in_range)
+        self.known_players[name] = players_in_range
+
+        return WorldUpdate(self.tick_count, tuple(entered), tuple(moved_near), left, tuple(encounters),
+                           tuple(players_entered), tuple(players_moved), players_left)
+
+    def tick(self):
+        """Advance the world once. Returns {player name: WorldUpdate}."""
+        self.tick_count += 1
+        moved = self.move_monsters()
+        return {name: self.update_for(name, moved) for name in self.players}
+
+
+def simulate_clients(num_players=300, num_monsters=2000, grid_size=200, ticks=100, check=True, seed=None):
+    """
+    Load generator: num_players simulated clients wander a shared world for
+    ticks ticks, each keeping its own view built only from its updates.
+    With check=True every client's view is compared against the real world.
+    A seed makes the whole run (players and monsters) repeatable; it seeds
+    one random.Random shared by the clients and the world, never the global
+    random module.
+
+    Returns:
+        dict: timing and traffic numbers for the run.
+    """
+    rng = random.Random(seed)
+    world = SharedWorld(grid_size, (grid_size // 2, grid_size // 2), rng=rng)
+    for i in range(num_players):
+        world.add_player(f"client{i}", (rng.randrange(grid_size), rng.randrange(grid_size)))
+    world.spawn_monsters(num_monsters)
+
+    views = {name: {} for name in world.players}
+    player_views = {name: {} for name in world.players}
+    directions = [(0, -1), (0, 1), (-1, 0), (1, 0), (0, 0)]
+    tick_times = []
+    entries_sent = 0
+
+    for _ in range(ticks):
+        for name in world.players:
+            world.move_player(name, *rng.choice(directions))
+
+        start = time.perf_counter()
+        updates = world.tick()
+        tick_times.append(time.perf_counter() - start)
+
+        for name, update in updates.items():
+            view = views[name]
+            for monster_id, x, y in update.entered + update.moved:
+                view[monster_id] = (x, y)
+            for monster_id in update.left:
+                del view[monster_id]
+            player_view = player_views[name]
+            for other, x, y in update.players_entered + update.players_moved:
+                player_view[other] = (x, y)
+            for other in update.players_left:
+                del player_view[other]
+            entries_sent += len(update.entered) + len(update.moved) + len(update.left)
+            entries_sent += len(update.players_entered) + len(update.players_moved) + len(update.players_left)
+
+        if check:
+            for name, view in views.items():
+                px, py = world.players[name]
+                expected = {
+                    monster_id: (m.x, m.y) for monster_id, m in world.monsters.items()
+                    if abs(m.x - px) <= world.interest_radius and abs(m.y - py) <= world.interest_radius
+                }
+                if view != expected:
+                    raise AssertionError(f"{name} has an out of date view on tick {world.tick_count}")
+                expected_players = {
+                    other: tuple(pos) for other, pos in world.players.items()
+                    if other != name and abs(pos[0] - px) <= world.interest_radius
+                    and abs(pos[1] - py) <= world.interest_radius
+                }
+                if player_views[name] != expected_players:
+                    raise AssertionError(f"{name} has an out of date view of other players on tick {world.tick_count}")
+
+    return {
+        "players": num_players,
+        "monsters": num_monsters,
+        "ticks": ticks,
+        "avg_tick_ms": 1000 * sum(tick_times) / len(tick_times),
+        "max_tick_ms": 1000 * max(tick_times),
+        "avg_entries_per_player_tick": entries_sent / (num_players * ticks),
+    }
+
+
+if __name__ == "__main__":
+    print(simulate_clients(num_players=100, ticks=50))
+    print(simulate_clients(num_players=500, ticks=50))
+    print(simulate_clients(num_players=500, num_monsters=20000, grid_size=1000, ticks=20, check=False))
@@ -0,0 +1,242 @@
+# telemetry.py
+"""
+Local SQLite telemetry for fights, shop purchases and the player's HP/gold.
+
+Game code calls the record_* functions, which only put a row on a queue.
+A background writer thread batches the rows into one transaction at a time
+(WAL mode), so the game loop never waits on the disk. If start() was never
+called the record_* functions do nothing.
+"""
+
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+
+DEFAULT_DB = "telemetry.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fights (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    player TEXT NOT NULL,
+    monster TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    gold_gained INTEGER NOT NULL,
+    hp_after INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fights_player_ts ON fights (player, ts);
+
+CREATE TABLE IF NOT EXISTS purchases (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    player TEXT NOT NULL,
+    item TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    price INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS purchases_item ON purchases (item, quantity);
+
+CREATE TABLE IF NOT EXISTS status (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    player TEXT NOT NULL,
+    hp INTEGER NOT NULL,
+    gold INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS status_player_ts ON status (player, ts);
+
+-- Rollups kept up to date by the writer, so leaderboard queries never scan fights
+CREATE TABLE IF NOT EXISTS monster_kills (
+    monster TEXT PRIMARY KEY,
+    kills INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS player_kills (
+    player TEXT PRIMARY KEY,
+    kills INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS player_kills_kills ON player_kills (kills);
+CREATE TABLE IF NOT EXISTS hourly_gold (
+    player TEXT NOT NULL,
+    hour INTEGER NOT NULL,
+    gold INTEGER NOT NULL,
+    PRIMARY KEY (player, hour)
+);
+"""
+
+_INSERTS = {
+    "fights": "INSERT INTO fights (ts, player, monster, outcome, gold_gained, hp_after) VALUES (?, ?, ?, ?, ?, ?)",
+    "purchases": "INSERT INTO purchases (ts, player, item, quantity, price) VALUES (?, ?, ?, ?, ?)",
+    "status": "INSERT INTO status (ts, player, hp, gold) VALUES (?, ?, ?, ?)",
+}
+
+_UPSERTS = {
+    "monster_kills": "INSERT INTO monster_kills (monster, kills) VALUES (?, ?) "
+                     "ON CONFLICT (monster) DO UPDATE SET kills = kills + excluded.kills",
+    "player_kills": "INSERT INTO player_kills (player, kills) VALUES (?, ?) "
+                    "ON CONFLICT (player) DO UPDATE SET kills = kills + excluded.kills",
+    "hourly_gold": "INSERT INTO hourly_gold (player, hour, gold) VALUES (?, ?, ?) "
+                   "ON CONFLICT (player, hour) DO UPDATE SET gold = gold + excluded.gold",
+}
+
+# Outcomes of fight_monster that count as a kill
+KILL_OUTCOMES = ("won", "special")
+
+
+def connect(path=DEFAULT_DB):
+    """Open the telemetry database, creating tables and indexes if needed."""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+class TelemetryWriter(threading.Thread):
+    """Background thread that writes queued rows in batches."""
+
+    _STOP = object()
+
+    def __init__(self, path=DEFAULT_DB, batch_size=5000, flush_interval=1.0):
+        super().__init__(daemon=True)
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows = queue.Queue()
+
+    def record(self, table, row):
+        self.rows.put((table, row))
+
+    def close(self):
+        """Write anything still queued and stop the thread."""
+        self.rows.put(self._STOP)
+        self.join()
+
+    def _flush(self, conn, pending):
+        by_table = {}
+        monster_kills = {}
+        player_kills = {}
+        hourly_gold = {}
+        for table, row in pending:
+            by_table.setdefault(table, []).append(row)
+            if table == "fights":
+                ts, player, monster, outcome, gold_gained, hp_after = row
+                if outcome in KILL_OUTCOMES:
+                    monster_kills[monster] = monster_kills.get(monster, 0) + 1
+                    player_kills[player] = player_kills.get(player, 0) + 1
+                key = (player, int(ts // 3600) * 3600)
+                hourly_gold[key] = hourly_gold.get(key, 0) + gold_gained
+
+        with conn:
+            for table, rows in by_table.items():
+                conn.executemany(_INSERTS[table], rows)
+            conn.executemany(_UPSERTS["monster_kills"], monster_kills.items())
+            conn.executemany(_UPSERTS["player_kills"], player_kills.items())
+            conn.executemany(_UPSERTS["hourly_gold"], [k + (v,) for k, v in hourly_gold.items()])
+        pending.clear()
+
+    def run(self):
+        try:
+            conn = connect(self.path)
+        except sqlite3.Error as e:
+            # the thread ends here; record_* stop queuing once it is gone
+            print(f"WARNING: Telemetry disabled, could not open {self.path}. Error: {e}")
+            return
+
+        pending = []
+        deadline = time.monotonic() + self.flush_interval
+        stopping = False
+
+        while not stopping:
+            try:
+                item = self.rows.get(timeout=max(0.0, deadline - time.monotonic()))
+                if item is self._STOP:
+                    stopping = True
+                else:
+                    pending.append(item)
+            except queue.Empty:
+                pass
+
+            if pending and (stopping or len(pending) >= self.batch_size or time.monotonic() >= deadline):
+                try:
+                    self._flush(conn, pending)
+                except sqlite3.Error as e:
+                    # drop this batch rather than let it pile up behind a bad write
+                    print(f"WARNING: Lost {len(pending)} telemetry rows. Error: {e}")
+                    pending.clear()
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+
+        conn.close()
+
+
+_writer = None
+
+
+def start(path=DEFAULT_DB):
+    """Start recording telemetry for this session."""
+    global _writer
+    if _writer is None:
+        _writer = TelemetryWriter(path)
+        _writer.start()
+        atexit.register(stop)
+
+
+def stop():
+    """Flush and stop the telemetry writer."""
+    global _writer
+    if _writer is not None:
+        _writer.close()
+        _writer = None
+
+
+def _record(table, row):
+    # a writer that has died would never drain its queue
+    if _writer is not None and _writer.is_alive():
+        _writer.record(table, row)
+
+
+def record_fight(player_name, monster_name, outcome, gold_gained, hp_after):
+    _record("fights", (time.time(), player_name, monster_name, outcome, gold_gained, hp_after))
+
+
+def record_purchase(player_name, item_name, quantity, price):
+    _record("purchases", (time.time(), player_name, item_name, quantity, price))
+
+
+def record_status(player_name, hp, gold):
+    _record("status", (time.time(), player_name, hp, gold))
+
+
+# Queries
+
+def kills_per_monster(path=DEFAULT_DB):
+    """Return [(monster, kills)] with the most killed monster first."""
+    conn = connect(path)
+    try:
+        return conn.execute("SELECT monster, kills FROM monster_kills ORDER BY kills DESC").fetchall()
+    finally:
+        conn.close()
+
+
+def leaderboard(limit=10, path=DEFAULT_DB):
+    """Return the top [(player, kills)]."""
+    conn = connect(path)
+    try:
+        return conn.execute(
+            "SELECT player, kills FROM player_kills ORDER BY kills DESC LIMIT ?", (limit,)
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+def gold_per_hour(player_name, path=DEFAULT_DB):
+    """Return [(hour start timestamp, gold earned from fights)] for one player."""
+    conn = connect(path)
+    try:
+        return conn.execute(
+            "SELECT hour, gold FROM hourly_gold WHERE player = ? ORDER BY hour", (player_name,)
+        ).fetchall()
+    finally:
+        conn.close()
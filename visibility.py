@@ -0,0 +1,128 @@
+# visibility.py
+"""
+Fog of war for the map.
+
+Field of view is found with recursive shadowcasting, and only cells within
+the view radius are looked at, so the cost does not depend on the map size.
+Tiles the player has ever seen are kept in a bitset (one bit per tile).
+"""
+
+import binascii
+
+# (xx, xy, yx, yy) transforms that map the first octant onto all eight
+_OCTANTS = [
+    (1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+    (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1),
+]
+
+
+def explored_at(explored, grid_size, x, y):
+    """Check one tile in an explored bitset (bytes or bytearray)."""
+    cell = y * grid_size + x
+    return bool(explored[cell >> 3] & (1 << (cell & 7)))
+
+
+def _never_blocks(x, y):
+    return False
+
+
+def _cast_light(cx, cy, row, start, end, radius, xx, xy, yx, yy, grid_size, blocks_light, visible):
+    """Scan one octant row by row, recursing around anything that blocks light."""
+    if start < end:
+        return
+
+    radius_sq = radius * radius
+    new_start = start
+    for j in range(row, radius + 1):
+        dx, dy = -j - 1, -j
+        blocked = False
+        while dx <= 0:
+            dx += 1
+            x = cx + dx * xx + dy * xy
+            y = cy + dx * yx + dy * yy
+            left_slope = (dx - 0.5) / (dy + 0.5)
+            right_slope = (dx + 0.5) / (dy - 0.5)
+            if start < right_slope:
+                continue
+            if end > left_slope:
+                break
+
+            in_bounds = 0 <= x < grid_size and 0 <= y < grid_size
+            if in_bounds and dx * dx + dy * dy <= radius_sq:
+                visible.add((x, y))
+            opaque = in_bounds and blocks_light(x, y)
+
+            if blocked:
+                if opaque:
+                    new_start = right_slope
+                    continue
+                blocked = False
+                start = new_start
+            elif opaque and j < radius:
+                blocked = True
+                _cast_light(cx, cy, j + 1, start, left_slope, radius,
+                            xx, xy, yx, yy, grid_size, blocks_light, visible)
+                new_start = right_slope
+        if blocked:
+            break
+
+
+def compute_fov(origin, radius, grid_size, blocks_light=None):
+    """Return the set of (x, y) cells visible from origin within radius."""
+    if blocks_light is None:
+        blocks_light = _never_blocks
+
+    cx, cy = origin
+    visible = {(cx, cy)}
+    for xx, xy, yx, yy in _OCTANTS:
+        _cast_light(cx, cy, 1, 1.0, 0.0, radius, xx, xy, yx, yy, grid_size, blocks_light, visible)
+    return visible
+
+
+class Visibility:
+    """
+    Tracks what the player can see now and which tiles they have explored.
+
+    update() does nothing unless the player has actually moved. A move runs
+    the whole shadowcast again, which costs O(radius**2) cells however far
+    the player went; only the tiles that just came into view are then
+    written to the explored bitset.
+    """
+
+    def __init__(self, grid_size, radius, explored=None, blocks_light=None):
+        self.grid_size = grid_size
+        self.radius = radius
+        self.blocks_light = blocks_light
+        self.origin = None
+        self.visible = frozenset()
+
+        size = (grid_size * grid_size + 7) // 8
+        self.explored = bytearray(size)
+        if explored:
+            stored = binascii.unhexlify(explored)
+            self.explored[:min(size, len(stored))] = stored[:size]
+
+    def update(self, origin):
+        """Recompute the whole field of view around origin. Returns the visible set."""
+        origin = (origin[0], origin[1])
+        if origin == self.origin:
+            return self.visible
+
+        visible = frozenset(compute_fov(origin, self.radius, self.grid_size, self.blocks_light))
+        for x, y in visible - self.visible:
+            cell = y * self.grid_size + x
+            self.explored[cell >> 3] |= 1 << (cell & 7)
+
+        self.origin = origin
+        self.visible = visible
+        return visible
+
+    def is_visible(self, x, y):
+        return (x, y) in self.visible
+
+    def is_explored(self, x, y):
+        return explored_at(self.explored, self.grid_size, x, y)
+
+    def explored_to_str(self):
+        """Return the explored bitset as a hex string for map_state."""
+        return binascii.hexlify(bytes(self.explored)).decode("ascii")
@@ -22,6 +22,12 @@ MONSTER_COLORS = {
     "Three-Headed Giant": (0, 200, 0),           # green
 }
 
+# Monster surfaces, keyed by (monster name, tile size), so monsters of the
+# same type share one image instead of loading it again. Each entry is
+# (surface, final): a fallback made before a display existed is not final,
+# because convert_alpha() needs a display, so the real image is tried once more.
+_IMAGE_CACHE = {}
+
 # Image paths for each monster type
 MONSTER_IMAGES = {
     "Killer Rabbit of Caerbannog": "images/monster.png",
@@ -54,44 +60,122 @@ _MONSTER_TEMPLATES = [
 ]
 
 
+class FreeCells:
+    """
+    The unoccupied cells of a grid, stored so a random one can be taken in O(1).
+
+    cells holds every free cell (as y * grid_size + x) in no particular order and
+    slot_of maps a cell back to its position in cells. Removing a cell swaps the
+    last one into its spot, so nothing ever has to shift.
+    """
+
+    def __init__(self, grid_size, blocked_positions=None):
+        self.grid_size = grid_size
+        self.cells = list(range(grid_size * grid_size))
+        self.slot_of = list(range(grid_size * grid_size))
+
+        for pos in blocked_positions or []:
+            self.remove(pos[0], pos[1])
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, pos):
+        x, y = pos
+        if x < 0 or y < 0 or x >= self.grid_size or y >= self.grid_size:
+            return False
+        return self.slot_of[y * self.grid_size + x] >= 0
+
+    def _take(self, slot):
+        cell = self.cells[slot]
+        last = self.cells.pop()
+        if last != cell:
+            self.cells[slot] = last
+            self.slot_of[last] = slot
+        self.slot_of[cell] = -1
+        return cell
+
+    def remove(self, x, y):
+        """Mark (x, y) as occupied. Does nothing if it already is."""
+        if (x, y) in self:
+            self._take(self.slot_of[y * self.grid_size + x])
+
+    def add(self, x, y):
+        """Mark (x, y) as free again."""
+        cell = y * self.grid_size + x
+        if self.slot_of[cell] < 0:
+            self.slot_of[cell] = len(self.cells)
+            self.cells.append(cell)
+
+    def pop_random(self, rng=None):
+        """Take a random free cell and return it as (x, y). rng defaults to the random module."""
+        cell = self._take((rng or random).randrange(len(self.cells)))
+        return cell % self.grid_size, cell // self.grid_size
+
+
 class WanderingMonster:
     """Represents a single wandering monster on the grid."""
 
-    def __init__(self, x=0, y=0, template=None, tile_size=32):
+    def __init__(self, x=0, y=0, template=None, tile_size=32, rng=None):
+        # stable id assigned by whoever places the monster in a world
+        self.id = None
+        self.image = None
+        self.reset(x, y, template, tile_size, rng)
+
+    def reset(self, x=0, y=0, template=None, tile_size=32, rng=None):
+        """
+        (Re)roll this monster as a fresh one at (x, y). Used by MonsterPool.
+        rng is a random.Random to roll with; the random module is used without one.
+        """
+        if rng is None:
+            rng = random
         if template is None:
-            template = random.choice(_MONSTER_TEMPLATES)
+            template = rng.choice(_MONSTER_TEMPLATES)
 
+        old_name = getattr(self, "name", None)
         self.x = int(x)
         self.y = int(y)
         self.name = template["name"]
         self.description = template["description"]
-        self.health = random.randint(*template["health_range"])
-        self.power = random.randint(*template["power_range"])
-        self.money = random.randint(*template["money_range"])
+        self.health = rng.randint(*template["health_range"])
+        self.power = rng.randint(*template["power_range"])
+        self.money = rng.randint(*template["money_range"])
         self.alive = True
 
         # color fallback
         self.color = MONSTER_COLORS.get(self.name, (200, 0, 0))
 
-        # load monster-specific image
-        self.image = self.load_monster_image(tile_size)
+        # load monster-specific image (a reused monster of the same type keeps its surface)
+        if self.image is None or self.name != old_name:
+            self.image = self.load_monster_image(tile_size)
 
     def load_monster_image(self, tile_size):
         """Loads a monster-specific image or a fallback colored tile."""
+        key = (self.name, tile_size)
+        has_display = pygame.display.get_surface() is not None
+        cached = _IMAGE_CACHE.get(key)
+        if cached is not None and (cached[1] or not has_display):
+            return cached[0]
+
         path = MONSTER_IMAGES.get(self.name, None)
         if path:
             try:
-                return load_image(path, size=(tile_size, tile_size))
+                image = load_image(path, size=(tile_size, tile_size))
+                _IMAGE_CACHE[key] = (image, True)
+                return image
 
             except Exception:
                 pass  # fall through to fallback
 
-        # fallback: colored box
-        return create_fallback_surface(self.color, tile_size)
+        # fallback: colored box, cached too so a missing file is not retried for every monster
+        image = create_fallback_surface(self.color, tile_size)
+        _IMAGE_CACHE[key] = (image, has_display)
+        return image
 
     def to_dict(self):
         """Return a serializable dict for storing in map_state."""
         return {
+            "id": self.id,
             "x": self.x,
             "y": self.y,
             "name": self.name,
@@ -105,53 +189,77 @@ class WanderingMonster:
 
     @classmethod
     def from_dict(cls, d, tile_size=32):
-        """Create a WanderingMonster-like object from a dict."""
-        inst = cls(
-            d.get("x", 0),
-            d.get("y", 0),
-            template={
-                "name": d.get("name"),
-                "description": d.get("description"),
-                "health_range": (d.get("health", 0), d.get("health", 0)),
-                "power_range": (d.get("power", 0), d.get("power", 0)),
-                "money_range": (d.get("money", 0), d.get("money", 0)),
-            },
-            tile_size=tile_size
-        )
-        # override fields with stored values (so we preserve randomized stats)
-        inst.health = d.get("health", inst.health)
-        inst.power = d.get("power", inst.power)
-        inst.money = d.get("money", inst.money)
-        inst.alive = d.get("alive", inst.alive)
-        inst.color = tuple(d.get("color", inst.color))
+        """Create a WanderingMonster from a dict saved by to_dict()."""
+        # skip __init__ so nothing gets re-rolled; the stored stats are the truth
+        inst = cls.__new__(cls)
+        inst.id = d.get("id")
+        inst.x = int(d.get("x", 0))
+        inst.y = int(d.get("y", 0))
+        inst.name = d.get("name")
+        inst.description = d.get("description")
+        inst.health = d.get("health", 0)
+        inst.power = d.get("power", 0)
+        inst.money = d.get("money", 0)
+        inst.alive = d.get("alive", True)
+        inst.color = tuple(d.get("color", MONSTER_COLORS.get(inst.name, (200, 0, 0))))
+        inst.image = inst.load_monster_image(tile_size)
         return inst
 
     @staticmethod
-    def random_at(grid_size, town_pos, avoid_positions=None, tile_size=32):
-        """Create a random monster at a location avoiding town/blocked spaces."""
-        if avoid_positions is None:
-            avoid_positions = []
+    def random_at(grid_size, town_pos, avoid_positions=None, tile_size=32, free=None):
+        """
+        Create a random monster at a location avoiding town/blocked spaces.
+        Pass a FreeCells as free to take the cell from it instead.
+        """
+        if free is None:
+            # a few cheap guesses first; only build FreeCells when the grid is crowded
+            blocked = {tuple(town_pos)} | {tuple(p) for p in avoid_positions or []}
+            for _ in range(8):
+                x = random.randrange(grid_size)
+                y = random.randrange(grid_size)
+                if (x, y) not in blocked:
+                    return WanderingMonster(x, y, tile_size=tile_size)
 
-        for _ in range(200):
-            x = random.randint(0, grid_size - 1)
-            y = random.randint(0, grid_size - 1)
+        monsters = WanderingMonster.spawn_many(1, grid_size, town_pos, avoid_positions, tile_size, free=free)
+        if monsters:
+            return monsters[0]
 
-            if (x, y) == tuple(town_pos):
-                continue
-            if (x, y) in [tuple(p) for p in avoid_positions]:
-                continue
+        # grid is completely full
+        return WanderingMonster(grid_size - 1, grid_size - 1, tile_size=tile_size)
 
-            return WanderingMonster(x, y, tile_size=tile_size)
+    @staticmethod
+    def spawn_many(count, grid_size, town_pos, avoid_positions=None, tile_size=32, pool=None, free=None, rng=None):
+        """
+        Create up to count monsters, each on its own free cell.
+        Stops early only when no free cells remain, so it never stacks monsters.
+        If a MonsterPool is given, dead monsters are reused before new ones are made.
 
-        return WanderingMonster(grid_size - 1, grid_size - 1, tile_size=tile_size)
+        free may be a FreeCells the caller keeps up to date (town and occupied
+        cells already removed); the new monsters' cells are taken out of it.
+        Without one, a FreeCells is built from town_pos and avoid_positions.
+        rng (a random.Random) picks cells and stats; defaults to the random module.
+        """
+        if free is None:
+            free = FreeCells(grid_size, [town_pos] + list(avoid_positions or []))
+
+        monsters = []
+        for _ in range(min(count, len(free))):
+            x, y = free.pop_random(rng)
+            if pool is not None:
+                monsters.append(pool.acquire(x, y, tile_size=tile_size, rng=rng))
+            else:
+                monsters.append(WanderingMonster(x, y, tile_size=tile_size, rng=rng))
+        return monsters
 
-    def move(self, grid_size, town_pos, player_pos, occupied_positions=None):
+    def move(self, grid_size, town_pos, player_pos, occupied_positions=None, rng=None):
         """
         Attempt to move the monster one step in a random direction.
         Restrictions:
             - Stay within grid bounds
             - Do not move into town_pos
-            - Optionally avoid occupied_positions (list of tuples)
+            - Optionally avoid occupied_positions (list or set of tuples)
+        player_pos may be None when there is no single player to walk onto.
+        rng (a random.Random) picks the direction; defaults to the random module.
         """
         if not self.alive:
             return
@@ -160,7 +268,7 @@ class WanderingMonster:
             occupied_positions = []
 
         directions = [(0, -1), (0, 1), (-1, 0), (1, 0), (0, 0)]
-        random.shuffle(directions)
+        (rng or random).shuffle(directions)
 
         for dx, dy in directions:
             nx = self.x + dx
@@ -172,7 +280,7 @@ class WanderingMonster:
             if (nx, ny) == tuple(town_pos):
                 continue
             # optionally avoid colliding with other monsters when moving
-            if (nx, ny) in occupied_positions and (nx, ny) != tuple(player_pos):
+            if (nx, ny) in occupied_positions and (player_pos is None or (nx, ny) != tuple(player_pos)):
                 # allow moving onto player_pos (triggers combat)
                 continue
             # valid move
@@ -189,3 +297,30 @@ class WanderingMonster:
             "power": self.power,
             "money": self.money,
         }
+
+
+class MonsterPool:
+    """
+    Holds dead monsters so respawning can reuse them (and their image
+    surfaces) instead of building new objects.
+    """
+
+    def __init__(self):
+        self.free = []
+
+    def __len__(self):
+        return len(self.free)
+
+    def release(self, monster):
+        """Hand back a monster that has left the world."""
+        monster.alive = False
+        monster.id = None
+        self.free.append(monster)
+
+    def acquire(self, x, y, template=None, tile_size=32, rng=None):
+        """Return a fresh monster at (x, y), reusing a released one if there is one."""
+        if self.free:
+            monster = self.free.pop()
+            monster.reset(x, y, template, tile_size, rng)
+            return monster
+        return WanderingMonster(x, y, template=template, tile_size=tile_size, rng=rng)